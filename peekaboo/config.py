@@ -38,6 +38,8 @@ from peekaboo.toolbox.cortex import tlp
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CONFIG_FILE = '/opt/peekaboo/etc/peekaboo.conf'
+
 
 class ListInterpolation(configparser.BasicInterpolation):
     """ An interpolation that correlates options of the form
@@ -48,13 +50,16 @@ class ListInterpolation(configparser.BasicInterpolation):
         structure in the parser. """
         value = super().before_read(parser, section, option, value)
 
-        # is it a list?
-        name_parts = option.split('.')
-        if len(name_parts) != 2:
+        # is it a list? Values are appended in the order they're given, the
+        # distinguisher does not imply a position. That way drop files can
+        # extend lists.
+        key, separator, distinguisher = option.partition('.')
+        if not separator or '.' in distinguisher:
             return value
 
-        key = name_parts[0]
-        distinguisher = name_parts[1]
+        # option names are interned by the parser, do the same for the list
+        # name derived from it
+        key = sys.intern(key)
         if distinguisher == '-' and value == '-':
             parser.reset_list(section, key)
             return None
@@ -62,6 +67,16 @@ class ListInterpolation(configparser.BasicInterpolation):
         parser.add_list_value(section, key, value)
         return None
 
+    def before_get(self, parser, section, option, value, defaults):
+        """ Interpolate value on retrieval. Most values, particularly in the
+        ruleset, contain nothing to interpolate. Return those as they are
+        instead of having the base class look them up once more and scan them
+        for references. """
+        if '%' not in value:
+            return value
+
+        return super().before_get(parser, section, option, value, defaults)
+
 
 class PeekabooConfigParser( # pylint: disable=too-many-ancestors
         configparser.ConfigParser):
@@ -72,6 +87,23 @@ class PeekabooConfigParser( # pylint: disable=too-many-ancestors
     RELIST = object()
     IRELIST = object()
 
+    # names of the getter routines by option type. The special types above
+    # only work when given explicitly as option_type.
+    GETTERS = {
+        int: 'getint',
+        float: 'getfloat',
+        bool: 'getboolean',
+        list: 'getlist',
+        tuple: 'getlist',
+        str: 'get',
+        None: 'get',
+        LOG_LEVEL: 'get_log_level',
+        OCTAL: 'getoctal',
+        RELIST: 'getrelist',
+        IRELIST: 'getirelist',
+        tlp: 'gettlp',
+    }
+
     def __init__(self, config_file):
         super().__init__(interpolation=ListInterpolation())
 
@@ -80,13 +112,23 @@ class PeekabooConfigParser( # pylint: disable=too-many-ancestors
         self.lists = {}
         self.relists = {}
 
+        # cache of values converted to their type by get_by_type()
+        self.typed_values = {}
+
+        # just try to open the file instead of checking for existence and
+        # permissions beforehand. That saves syscalls, avoids races and gives
+        # us the precise reason for failure via the exception.
         try:
-            self.read_file(open(config_file))
-        except IOError as ioerror:
+            self.read_config_file(config_file)
+        except PermissionError as permerror:
+            raise PeekabooConfigException(
+                'Configuration file "%s" is not accessible for reading: %s' %
+                (config_file, permerror))
+        except OSError as oserror:
             raise PeekabooConfigException(
                 'Configuration file "%s" can not be opened for reading: %s' %
-                (config_file, ioerror))
-        except configparser.Error as cperror:
+                (config_file, oserror))
+        except (configparser.Error, UnicodeDecodeError) as cperror:
             raise PeekabooConfigException(
                 'Configuration file "%s" can not be parsed: %s' %
                 (config_file, cperror))
@@ -107,19 +149,43 @@ class PeekabooConfigParser( # pylint: disable=too-many-ancestors
 
         drop_files = sorted(glob.glob(os.path.join(drop_dir, drop_file_glob)))
 
-        try:
-            read_files = self.read(drop_files)
-        except configparser.Error as cperror:
-            raise PeekabooConfigException(
-                    f'Configuration drop file can not be parsed: {cperror}'
-                ) from cperror
+        missing_files = set()
+        for drop_file in drop_files:
+            try:
+                self.read_config_file(drop_file)
+            except OSError:
+                missing_files.add(drop_file)
+            except (configparser.Error, UnicodeDecodeError) as cperror:
+                raise PeekabooConfigException(
+                        f'Configuration drop file can not be parsed: {cperror}'
+                    ) from cperror
 
-        missing_files = set(drop_files) - set(read_files)
         if missing_files:
             raise PeekabooConfigException(
                 'Some configuration drop files could not be read: '
                 f'{missing_files}')
 
+    def read_config_file(self, config_file):
+        """ Read and parse a configuration file. Configuration files are
+        small, so read them in one go without the buffering and decoding
+        layers of a text file object and parse the string.
+
+        @param config_file: path of the file to read
+        @type config_file: string
+        @raises OSError: if the file can not be read
+        @raises UnicodeDecodeError: if the file is not valid UTF-8
+        @raises configparser.Error: if the file can not be parsed """
+        with open(config_file, 'rb', buffering=0) as config_fd:
+            content = config_fd.read()
+
+        self.read_string(content.decode('utf-8'), source=config_file)
+
+    def optionxform(self, optionstr):
+        """ Normalise option names like the base class and intern them. Rules
+        and configuration classes look options up using literals, which are
+        interned as well, so dictionary lookups can succeed on identity. """
+        return sys.intern(super().optionxform(optionstr))
+
     def reset_list(self, section, option):
         """ Reset a list option. """
         if section not in self.lists:
@@ -218,24 +284,23 @@ class PeekabooConfigParser( # pylint: disable=too-many-ancestors
     def get_log_level(self, section, option, raw=False, vars=None,
                       fallback=None):
         """ Get the log level from the configuration file and parse the string
-        into a logging loglevel such as logging.CRITICAL. Raises config
-        exception if the log level is unknown. Options identical to get(). """
-        levels = {
-            'CRITICAL': logging.CRITICAL,
-            'ERROR': logging.ERROR,
-            'WARNING': logging.WARNING,
-            'INFO': logging.INFO,
-            'DEBUG': logging.DEBUG
-        }
-
+        into a logging loglevel such as logging.CRITICAL. Level names are
+        case-insensitive and may be any known to the logging module. Raises
+        config exception if the log level is unknown. Options identical to
+        get(). """
         level = self.get(section, option, raw=raw, vars=vars, fallback=None)
         if level is None:
             return fallback
 
-        if level not in levels:
+        # accept level names in any case. The logging module knows about all
+        # level names including custom ones registered using addLevelName().
+        # For unknown names it returns a string describing the level instead
+        # of its number.
+        numeric_level = logging.getLevelName(level.upper())
+        if not isinstance(numeric_level, int):
             raise PeekabooConfigException('Unknown log level %s' % level)
 
-        return levels[level]
+        return numeric_level
 
     def gettlp(self, section, option, raw=False, vars=None, fallback=None):
         levels = {
@@ -293,61 +358,67 @@ class PeekabooConfigParser( # pylint: disable=too-many-ancestors
         if option_type is None and fallback is not None:
             option_type = type(fallback)
 
-        getter = {
-            int: self.getint,
-            float: self.getfloat,
-            bool: self.getboolean,
-            list: self.getlist,
-            tuple: self.getlist,
-            str: self.get,
-            None: self.get,
-
-            # these only work when given explicitly as option_type
-            self.LOG_LEVEL: self.get_log_level,
-            self.OCTAL: self.getoctal,
-            self.RELIST: self.getrelist,
-            self.IRELIST: self.getirelist,
-            tlp: self.gettlp,
-        }
+        # values are converted only once and served from cache afterwards,
+        # saving repeated interpolation and conversion. As with regex lists,
+        # the configuration is not expected to change after being read.
+        cache_key = (section, option, option_type)
+        if cache_key in self.typed_values:
+            return self.typed_values[cache_key]
+
+        getter = getattr(self, self.GETTERS[option_type])
+        value = getter(section, option, fallback=fallback)
 
-        return getter[option_type](section, option, fallback=fallback)
+        # do not cache the default so a different one can be given next time
+        if value is not fallback:
+            self.typed_values[cache_key] = value
+
+        return value
 
     def set_known_options(self, config_options):
         """ Set a number of known config options as member variables. Also
         checks for unknown options being present.
 
-        @param config_options: the mapping of config option to section and
-                               option name
-        @type config_options: Dict of two-item-tuples
-                              (config_option: [section, option])
+        @param config_options: the member variables to set from section and
+                               option and the option type to enforce, if
+                               any
+        @type config_options: sequence of four-item-tuples
+                              (config_option, section, option, option_type)
         @raises PeekabooConfigException: if any unknown sections or options are
                                          found. """
-        settings = vars(self)
         check_options = {}
-        for (setting, config_names) in config_options.items():
-            section = config_names[0]
-            option = config_names[1]
-
+        for (setting, section, option, option_type) in config_options:
             # remember for later checking for unknown options
             if section not in check_options:
                 check_options[section] = []
             check_options[section].append(option)
 
-            # maybe force the option's value type
-            option_type = None
-            if len(config_names) == 3:
-                option_type = config_names[2]
+            # options in sections not present in the configuration keep their
+            # default. Don't bother looking them up because the getters would
+            # raise and catch a NoSectionError for each of them.
+            if not self.has_section(section):
+                continue
 
             # e.g.:
             # self.log_format = self.get('logging', 'log_format',
             #                            self.log_format)
-            settings[setting] = self.get_by_type(
-                section, option, fallback=settings[setting],
-                option_type=option_type)
+            setattr(self, setting, self.get_by_type(
+                section, option, fallback=getattr(self, setting),
+                option_type=option_type))
 
         # now check for unknown options
         self.check_config(check_options)
 
+    def discard_parsed_options(self):
+        """ Free the memory held by the parsed configuration once all options
+        have been transferred into member variables. Options can not be
+        retrieved from the parser any more afterwards. """
+        for section in self.sections():
+            self.remove_section(section)
+
+        self.lists.clear()
+        self.relists.clear()
+        self.typed_values.clear()
+
     def check_config(self, known_options):
         """ Check this configuration against a list of known options. Raise an
         exception if any unknown options are found.
@@ -394,15 +465,14 @@ class PeekabooConfigParser( # pylint: disable=too-many-ancestors
         @returns: None
         @raises PeekabooConfigException: if any unknown options are found. """
         try:
-            section_options = map(
-                # account for option.1 list syntax
-                lambda x: x.split('.')[0],
-                self.options(section))
+            # account for option.1 list syntax
+            section_options = {
+                option.partition('.')[0] for option in self.options(section)}
         except configparser.NoSectionError:
             # a non-existant section can have no non-allowed options :)
             return
 
-        option_diff = set(section_options) - set(known_options)
+        option_diff = section_options.difference(known_options)
         if option_diff:
             raise PeekabooConfigException(
                 'Unknown config option(s) found in section %s: %s'
@@ -411,6 +481,37 @@ class PeekabooConfigParser( # pylint: disable=too-many-ancestors
 
 class PeekabooConfig(PeekabooConfigParser):
     """ This class represents the Peekaboo configuration. """
+    # section and option names for the configuration file. First item is the
+    # name of the member variable whose default will be overwritten by the
+    # configuration file value. Fourth item can be an option type if special
+    # parsing is required.
+    CONFIG_OPTIONS = (
+        ('log_level', 'logging', 'log_level', PeekabooConfigParser.LOG_LEVEL),
+        ('log_format', 'logging', 'log_format', None),
+        ('user', 'global', 'user', None),
+        ('group', 'global', 'group', None),
+        ('pid_file', 'global', 'pid_file', None),
+        ('host', 'global', 'host', None),
+        ('port', 'global', 'port', None),
+        ('worker_count', 'global', 'worker_count', None),
+        ('processing_info_dir', 'global', 'processing_info_dir', None),
+        ('report_locale', 'global', 'report_locale', None),
+        ('db_url', 'db', 'url', None),
+        ('db_log_level', 'db', 'log_level', PeekabooConfigParser.LOG_LEVEL),
+        ('ruleset_config', 'ruleset', 'config', None),
+        ('analyzer_config', 'analyzers', 'config', None),
+        ('cluster_instance_id', 'cluster', 'instance_id', None),
+        ('cluster_stale_in_flight_threshold', 'cluster',
+         'stale_in_flight_threshold', None),
+        ('cluster_duplicate_check_interval', 'cluster',
+         'duplicate_check_interval', None),
+    )
+
+    # our settings as opposed to the internal state of the parser, which also
+    # lives in our instance dict
+    SETTINGS = ('config_file',) + tuple(
+        option[0] for option in CONFIG_OPTIONS)
+
     def __init__(self, config_file=None, log_level=None):
         """ Initialise the configuration with defaults, overwrite with command
         line options and finally read the configuration file. """
@@ -431,37 +532,13 @@ class PeekabooConfig(PeekabooConfigParser):
         self.report_locale = None
         self.db_url = 'sqlite:////var/lib/peekaboo/peekaboo.db'
         self.db_log_level = logging.WARNING
-        self.config_file = '/opt/peekaboo/etc/peekaboo.conf'
+        self.config_file = DEFAULT_CONFIG_FILE
         self.ruleset_config = '/opt/peekaboo/etc/ruleset.conf'
         self.analyzer_config = '/opt/peekaboo/etc/analyzers.conf'
         self.cluster_instance_id = 0
         self.cluster_stale_in_flight_threshold = 15*60
         self.cluster_duplicate_check_interval = 60
 
-        # section and option names for the configuration file. key is the above
-        # variable name whose value will be overwritten by the configuration
-        # file value. Third item can be getter function if special parsing is
-        # required.
-        config_options = {
-            'log_level': ['logging', 'log_level', self.LOG_LEVEL],
-            'log_format': ['logging', 'log_format'],
-            'user': ['global', 'user'],
-            'group': ['global', 'group'],
-            'pid_file': ['global', 'pid_file'],
-            'host': ['global', 'host'],
-            'port': ['global', 'port'],
-            'worker_count': ['global', 'worker_count'],
-            'processing_info_dir': ['global', 'processing_info_dir'],
-            'report_locale': ['global', 'report_locale'],
-            'db_url': ['db', 'url'],
-            'db_log_level': ['db', 'log_level', self.LOG_LEVEL],
-            'ruleset_config': ['ruleset', 'config'],
-            'analyzer_config': ['analyzers', 'config'],
-            'cluster_instance_id': ['cluster', 'instance_id'],
-            'cluster_stale_in_flight_threshold': ['cluster', 'stale_in_flight_threshold'],
-            'cluster_duplicate_check_interval': ['cluster', 'duplicate_check_interval'],
-        }
-
         # overrides from outside, e.g. by command line arguments whose values
         # are needed while reading the configuration file already (most notably
         # log level and path to the config file).
@@ -480,11 +557,15 @@ class PeekabooConfig(PeekabooConfigParser):
         super().__init__(self.config_file)
 
         # overwrite above defaults in our member variables via indirect access
-        self.set_known_options(config_options)
+        self.set_known_options(self.CONFIG_OPTIONS)
 
         # Update logging with what we just parsed from the config
         self.setup_logging()
 
+        # everything of interest is in our member variables now and we're
+        # kept around for the whole runtime
+        self.discard_parsed_options()
+
         # here we could overwrite defaults and config file with additional
         # command line arguments if required
 
@@ -507,18 +588,73 @@ class PeekabooConfig(PeekabooConfigParser):
         _logger.setLevel(self.log_level)
 
     def __str__(self):
-        settings = {}
-        for (option, value) in vars(self).items():
-            if not option.startswith('_'):
-                settings[option] = value
-
-        return '<PeekabooConfig(%s)>' % settings
+        return '<PeekabooConfig(%s)>' % ', '.join(
+            '%s=%r' % (option, getattr(self, option))
+            for option in self.SETTINGS)
 
     __repr__ = __str__
 
 
+# already loaded main configurations and the modification time of their file
+# by path and log level
+_loaded_configs = {}
+
+
+def load_config(config_file=None, log_level=None):
+    """ Get the main Peekaboo configuration, reusing an instance created
+    earlier if the configuration file has not been modified since. Note that
+    changes to drop files alone are not detected.
+
+    @param config_file: path to the configuration file, defaults to
+                        DEFAULT_CONFIG_FILE
+    @type config_file: string
+    @param log_level: log level override, see PeekabooConfig
+    @type log_level: int
+    @returns: PeekabooConfig
+    @raises PeekabooConfigException: if the configuration is invalid """
+    if config_file is None:
+        config_file = DEFAULT_CONFIG_FILE
+
+    try:
+        mtime = os.stat(config_file).st_mtime_ns
+    except OSError:
+        # have the configuration report the error in the usual way
+        return PeekabooConfig(config_file=config_file, log_level=log_level)
+
+    key = (os.path.abspath(config_file), log_level)
+    cached = _loaded_configs.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    config = PeekabooConfig(config_file=config_file, log_level=log_level)
+    _loaded_configs[key] = (mtime, config)
+    return config
+
+
 class PeekabooAnalyzerConfig(PeekabooConfigParser):
     """ This class represents the analyzer configuration. """
+    # member variable, section, option and option type as with PeekabooConfig
+    CONFIG_OPTIONS = (
+        ('cuckoo_url', 'cuckoo', 'url', None),
+        ('cuckoo_api_token', 'cuckoo', 'api_token', None),
+        ('cuckoo_poll_interval', 'cuckoo', 'poll_interval', None),
+        ('cuckoo_submit_original_filename', 'cuckoo',
+         'submit_original_filename', None),
+        ('cuckoo_maximum_job_age', 'cuckoo', 'maximum_job_age', None),
+        ('cuckoo_use_cape_api', 'cuckoo', 'use_cape_api', None),
+
+        ('cortex_url', 'cortex', 'url', None),
+        ('cortex_tlp', 'cortex', 'tlp', None),
+        ('cortex_api_token', 'cortex', 'api_token', None),
+        ('cortex_poll_interval', 'cortex', 'poll_interval', None),
+        ('cortex_submit_original_filename', 'cortex',
+         'submit_original_filename', None),
+        ('cortex_maximum_job_age', 'cortex', 'maximum_job_age', None),
+    )
+
+    # our settings as opposed to the internal state of the parser
+    SETTINGS = tuple(option[0] for option in CONFIG_OPTIONS)
+
     def __init__(self, config_file=None):
         """ Initialise the configuration with defaults, overwrite with command
         line options and finally read the configuration file. """
@@ -536,38 +672,18 @@ class PeekabooAnalyzerConfig(PeekabooConfigParser):
         self.cortex_submit_original_filename = True
         self.cortex_maximum_job_age = 15*60
 
-        config_options = {
-            'cuckoo_url': ['cuckoo', 'url'],
-            'cuckoo_api_token': ['cuckoo', 'api_token'],
-            'cuckoo_poll_interval': ['cuckoo', 'poll_interval'],
-            'cuckoo_submit_original_filename': [
-                'cuckoo', 'submit_original_filename'],
-            'cuckoo_maximum_job_age': ['cuckoo', 'maximum_job_age'],
-            'cuckoo_use_cape_api': ['cuckoo', 'use_cape_api'],
-
-            'cortex_url': ['cortex', 'url'],
-            'cortex_tlp': ['cortex', 'tlp'],
-            'cortex_api_token': ['cortex', 'api_token'],
-            'cortex_poll_interval': ['cortex', 'poll_interval'],
-            'cortex_submit_original_filename': [
-                'cortex', 'submit_original_filename'],
-            'cortex_maximum_job_age': ['cortex', 'maximum_job_age'],
-        }
-
         # read configuration file. Note that we require a configuration file
         # here. We may change that if we decide that we want to allow the user
         # to run us with the above defaults only.
         super().__init__(config_file)
 
         # overwrite above defaults in our member variables via indirect access
-        self.set_known_options(config_options)
+        self.set_known_options(self.CONFIG_OPTIONS)
+        self.discard_parsed_options()
 
     def __str__(self):
-        settings = {}
-        for (option, value) in vars(self).items():
-            if not option.startswith('_'):
-                settings[option] = value
-
-        return '<PeekabooConfig(%s)>' % settings
+        return '<PeekabooAnalyzerConfig(%s)>' % ', '.join(
+            '%s=%r' % (option, getattr(self, option))
+            for option in self.SETTINGS)
 
     __repr__ = __str__
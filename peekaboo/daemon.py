@@ -41,7 +41,7 @@ from sdnotify import SystemdNotifier
 from sqlalchemy.exc import SQLAlchemyError
 from peekaboo import PEEKABOO_OWL, __version__
 from peekaboo.config import (
-    PeekabooConfig, PeekabooConfigParser, PeekabooAnalyzerConfig)
+    load_config, PeekabooConfigParser, PeekabooAnalyzerConfig)
 from peekaboo.db import PeekabooDatabase
 from peekaboo.queuing import JobQueue
 from peekaboo.sample import SampleFactory
@@ -255,7 +255,7 @@ async def async_main():
         log_level = logging.DEBUG
 
     try:
-        config = PeekabooConfig(config_file=args.config, log_level=log_level)
+        config = load_config(config_file=args.config, log_level=log_level)
         logger.debug(config)
     except PeekabooConfigException as error:
         logging.critical(error)
@@ -135,14 +135,26 @@ class OperatorRegex:
         # We use re.search to implement the membership operator (in) in the
         # sense of "matches anywhere in the string". We can use the regex
         # as given for that.
+        # This also validates the expression right away.
         self.membership_regex = re.compile(string)
-        # For equality matches we use re.match which already anchors the
-        # matching at the start of the operand but does not require a match all
-        # up until the end of it. So we need to add an explicit end-of-line anchor.
-        self.equality_regex = re.compile("%s$" % string)
-        # NOTE: Take the multiline semantics of re.search vs. re.match into
-        # account when looking to change this (although we're not using
-        # multiline mode as of now).
+        self.string = string
+        self._equality_regex = None
+
+    @property
+    def equality_regex(self):
+        """ The regex anchored for equality matches. Compiled on first use
+        because most regexes are only ever used with one kind of operator. """
+        if self._equality_regex is None:
+            # For equality matches we use re.match which already anchors the
+            # matching at the start of the operand but does not require a
+            # match all up until the end of it. So we need to add an explicit
+            # end-of-line anchor.
+            # NOTE: Take the multiline semantics of re.search vs. re.match
+            # into account when looking to change this (although we're not
+            # using multiline mode as of now).
+            self._equality_regex = re.compile("%s$" % self.string)
+
+        return self._equality_regex
 
     @staticmethod
     def compare_op_impl(function, other):
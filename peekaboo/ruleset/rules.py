@@ -27,7 +27,6 @@
 
 
 import asyncio
-import re
 import logging
 from peekaboo.ruleset import Result, RuleResult
 from peekaboo.ruleset.expressions import ExpressionParser, \
@@ -481,8 +480,7 @@ class CuckooEvilSigRule(CuckooRule):
             # 'bar'] being stringified to "['foo', 'bar']" and matching
             # /fo.*ar/.
             for sig in sigs:
-                match = re.search(bad_sig, sig)
-                if match:
+                if bad_sig.search(sig):
                     matched_bad_sigs.append(sig)
 
         if not matched_bad_sigs:
@@ -527,12 +525,14 @@ class RequestsEvilDomainRule(CuckooRule):
     rule_name = 'requests_evil_domain'
 
     def get_config(self):
-        self.evil_domains = self.get_config_value('domain', [])
-        if not self.evil_domains:
+        evil_domains = self.get_config_value('domain', [])
+        if not evil_domains:
             raise PeekabooRulesetConfigError(
                 "Empty evil domain list, check %s rule config."
                 % self.rule_name)
 
+        self.evil_domains = set(evil_domains)
+
     def evaluate_report(self, report):
         """ Report the sample as bad if one of the requested domains is on our
         list of evil domains. """
@@ -25,7 +25,6 @@
 
 
 import logging
-import re
 from oletools.olevba import VBA_Parser, FileOpenError
 from oletools.olevba import detect_autoexec, detect_suspicious
 
@@ -168,7 +167,8 @@ class OletoolsReport:
         """
         Detects macros with supplied suspicious keywords in Microsoft Office documents.
 
-        @param suspicious_keywords: List of suspicious keyword regexes.
+        @param suspicious_keywords: List of compiled suspicious keyword
+                                    regexes.
         @return: True if macros with keywords where found, otherwise False.
                 If VBA_Parser crashes it returns False too.
         """
@@ -178,7 +178,7 @@ class OletoolsReport:
 
         suspicious = False
         for word in suspicious_keywords:
-            if re.search(word, vba):
+            if word.search(vba):
                 suspicious = True
                 break
 
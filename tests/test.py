@@ -46,7 +46,7 @@ sys.path.append(os.path.dirname(TESTSDIR))
 from peekaboo.exceptions import PeekabooConfigException, \
         PeekabooRulesetConfigError
 from peekaboo.config import (
-    PeekabooConfig, PeekabooConfigParser, PeekabooAnalyzerConfig)
+    PeekabooConfig, PeekabooConfigParser, PeekabooAnalyzerConfig, load_config)
 from peekaboo.sample import Sample, JobState
 from peekaboo.ruleset import RuleResult, Result
 from peekaboo.ruleset.engine import RulesetEngine
@@ -181,6 +181,33 @@ nonoctal2: deadbeef'''
                     % nonoctal):
                 CreatingConfigParser(config).getoctal('section', nonoctal)
 
+    def test_5_typed_value_cache(self):
+        """ Test caching of values converted by type """
+        config = CreatingConfigParser('''[section]
+number: 17''')
+
+        self.assertEqual(config.get_by_type('section', 'number', 0), 17)
+        self.assertEqual(config.typed_values[('section', 'number', int)], 17)
+        self.assertEqual(config.get_by_type('section', 'number', 0), 17)
+
+        # defaults must not be cached
+        self.assertEqual(config.get_by_type('section', 'missing', 5), 5)
+        self.assertEqual(config.get_by_type('section', 'missing', 6), 6)
+        self.assertNotIn(('section', 'missing', int), config.typed_values)
+
+
+    def test_6_list_order(self):
+        """ Test that list values keep their order of appearance """
+        config = CreatingConfigParser('''[section]
+list.2: first
+list.10: second
+list.1: third
+not.a.list: value''')
+
+        self.assertEqual(config.getlist('section', 'list'),
+                         ['first', 'second', 'third'])
+        self.assertEqual(config.get('section', 'not.a.list'), 'value')
+
 
 class ConfigDropFile:
     """ A helper for creating config drop files with defined content. """
@@ -479,6 +506,21 @@ duplicate_check_interval: 61
         self.assertEqual(self.config.cluster_stale_in_flight_threshold, 31)
         self.assertEqual(self.config.cluster_duplicate_check_interval, 61)
 
+    def test_2_log_level_case(self):
+        """ Test that log level names are case-insensitive """
+        config = CreatingPeekabooConfig('''[logging]
+log_level: dEbUg
+
+[db]
+log_level: error''')
+        self.assertEqual(config.log_level, logging.DEBUG)
+        self.assertEqual(config.db_log_level, logging.ERROR)
+
+    def test_3_parsed_options_discarded(self):
+        """ Test that parsed options are dropped after being applied """
+        self.assertEqual(self.config.sections(), [])
+        self.assertEqual(self.config.typed_values, {})
+
 
 class TestInvalidConfig(unittest.TestCase):
     """ Various tests of invalid config files. """
@@ -536,6 +578,66 @@ foo: bar''')
             CreatingPeekabooConfig('''[logging]
 log_level: FOO''')
 
+    def test_7_inaccessible(self):
+        """ Test correct error is thrown if the config file is inaccessible
+        """
+        _, config_file = tempfile.mkstemp()
+        self.addCleanup(os.unlink, config_file)
+        os.chmod(config_file, 0o000)
+
+        with self.assertRaisesRegex(
+                PeekabooConfigException,
+                'Configuration file "%s" is not accessible for reading: '
+                r'\[Errno 13\] Permission denied' % config_file):
+            PeekabooConfig(config_file)
+
+
+class TestLoadConfig(unittest.TestCase):
+    """ Test reuse of already loaded configurations. """
+    def setUp(self):
+        """ Create a configuration file. """
+        _, self.config_file = tempfile.mkstemp()
+        with open(self.config_file, 'w') as file_desc:
+            file_desc.write('''[global]
+worker_count: 5''')
+
+    def test_1_reuse(self):
+        """ Test that an unmodified configuration is reused """
+        config = load_config(self.config_file)
+        self.assertEqual(config.worker_count, 5)
+        self.assertIs(load_config(self.config_file), config)
+        self.assertIsNot(
+            load_config(self.config_file, log_level=logging.DEBUG), config)
+
+    def test_2_modified(self):
+        """ Test that a modified configuration is reloaded """
+        config = load_config(self.config_file)
+
+        with open(self.config_file, 'w') as file_desc:
+            file_desc.write('''[global]
+worker_count: 7''')
+        # make sure the modification time differs for coarse timestamps
+        mtime = os.stat(self.config_file).st_mtime_ns + 1000000000
+        os.utime(self.config_file, ns=(mtime, mtime))
+
+        reloaded = load_config(self.config_file)
+        self.assertIsNot(reloaded, config)
+        self.assertEqual(reloaded.worker_count, 7)
+
+    def test_3_missing(self):
+        """ Test that a missing configuration file is reported """
+        os.unlink(self.config_file)
+        with self.assertRaisesRegex(
+                PeekabooConfigException,
+                'Configuration file "%s" can not be opened for reading: '
+                % self.config_file):
+            load_config(self.config_file)
+
+    def tearDown(self):
+        """ Remove the configuration file. """
+        if os.path.exists(self.config_file):
+            os.unlink(self.config_file)
+
 
 class CreatingAnalyzerConfig(PeekabooAnalyzerConfig, CreatingConfigMixIn):
     """ A special kind of analyzer config that creates the configuration file
@@ -2447,6 +2549,7 @@ def main():
     suite.addTest(unittest.makeSuite(TestDefaultConfig))
     suite.addTest(unittest.makeSuite(TestValidConfig))
     suite.addTest(unittest.makeSuite(TestInvalidConfig))
+    suite.addTest(unittest.makeSuite(TestLoadConfig))
     suite.addTest(unittest.makeSuite(TestDefaultAnalyzerConfig))
     suite.addTest(unittest.makeSuite(TestValidAnalyzerConfig))
     suite.addTest(unittest.makeSuite(TestSample))